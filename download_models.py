@@ -1,5 +1,4 @@
 import os
-from sentence_transformers import SentenceTransformer
 
 # Define the directory to save models
 MODEL_DIR = "models"
@@ -7,7 +6,7 @@ os.makedirs(MODEL_DIR, exist_ok=True)
 
 # Define the models to download
 # For Round 1A, these models are not strictly necessary as outline extraction
-# primarily relies on PyMuPDF and PDFMiner.six.
+# relies on PyMuPDF.
 # They are included here for consistency with a potential full solution setup.
 MODELS_TO_DOWNLOAD = [
     "all-MiniLM-L6-v2",
@@ -20,6 +19,7 @@ def download_and_save_model(model_name):
     if not os.path.exists(model_path):
         print(f"Downloading model: {model_name} to {model_path}...")
         try:
+            from sentence_transformers import SentenceTransformer
             # The from_pretrained method handles downloading and saving
             model = SentenceTransformer(model_name)
             model.save(model_path)
@@ -30,6 +30,11 @@ def download_and_save_model(model_name):
         print(f"Model {model_name} already exists at {model_path}.")
 
 if __name__ == "__main__":
-    for model_name in MODELS_TO_DOWNLOAD:
-        download_and_save_model(model_name)
-    print("Model download process completed.")
+    # Outline extraction never embeds text, so only pull in torch and the
+    # models when explicitly requested.
+    if os.environ.get("DOWNLOAD_EMBEDDINGS") == "1":
+        for model_name in MODELS_TO_DOWNLOAD:
+            download_and_save_model(model_name)
+        print("Model download process completed.")
+    else:
+        print("Skipping model download (set DOWNLOAD_EMBEDDINGS=1 to enable).")
@@ -1,13 +1,30 @@
 import os
 import json
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pdf_processor import process_pdf
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 INPUT_DIR = "input"
 OUTPUT_DIR = "output"
+MAX_WORKERS = 4
+
+
+def _worker(paths):
+    pdf_path, output_path = paths
+    return output_path, process_pdf(pdf_path)
+
 
 def main():
 
@@ -16,7 +33,8 @@ def main():
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    pdf_files = [f for f in os.listdir(INPUT_DIR) if f.lower().endswith(".pdf")]
+    with os.scandir(INPUT_DIR) as it:
+        pdf_files = [e.name for e in it if e.is_file() and e.name.lower().endswith(".pdf")]
 
     if not pdf_files:
         logging.warning(f"No PDF files found in {INPUT_DIR}. Exiting.")
@@ -24,16 +42,18 @@ def main():
 
     logging.info(f"Found {len(pdf_files)} PDF files to process.")
 
+    paths = []
     for pdf_file in pdf_files:
         pdf_path = os.path.join(INPUT_DIR, pdf_file)
         output_filename = os.path.splitext(pdf_file)[0] + ".json"
-        output_path = os.path.join(OUTPUT_DIR, output_filename)
-
-        result = process_pdf(pdf_path)
+        paths.append((pdf_path, os.path.join(OUTPUT_DIR, output_filename)))
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
-        logging.info(f"Output saved to {output_path}")
+    max_workers = min(os.cpu_count() or 1, len(paths), MAX_WORKERS)
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        for output_path, result in ex.map(_worker, paths, chunksize=1):
+            with open(output_path, 'wb') as f:
+                f.write(_dumps(result))
+            logging.info(f"Output saved to {output_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,46 +1,50 @@
 import fitz  # PyMuPDF
-import json
+import heapq
+import numpy as np
 import re
 import os
-from collections import Counter, defaultdict
-from statistics import mean
+from collections import defaultdict
+
+_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+_MERGE_Y_THRESHOLD = 5
+
+_RE_HYPHEN_NEWLINE = re.compile(r'-\s+')
+_RE_WS = re.compile(r'\s+')
+_RE_NOISE = re.compile(
+    r'(?:.*@.*\..*)'
+    r'|(?:\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b)'
+    r'|(?:\b\d{5}(?:[-\s]\d{4})?\b)'
+    r'|(?:\b(?:Street|St\.|Road|Rd\.|Parkway|Suite|Avenue)\b)'
+    r'|(?:(?:\b\w(?:\s|[:;.])+){4,})'
+    r'|(?:(?:RFP:\s*R\s+){2,})',
+    re.IGNORECASE
+)
+_RE_NOISE_KW = re.compile(
+    r'overview|email|date|rsvp|address|version|waiver|phone|fax'
+    r'|s\.no|name|age|relationship|dob|gender'
+)
+_RE_HAS_ALPHA = re.compile(r'[a-zA-Z]')
+_RE_META_BAD = re.compile(r'[_\\/\-]|\.docx?$')
 
 
 def clean_text(text):
-    text = re.sub(r'-\s+', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _RE_HYPHEN_NEWLINE.sub('', text)
+    text = _RE_WS.sub(' ', text).strip()
     return text.rstrip(':.')
 
 
-def merge_close_lines(lines, y_threshold=5):
-    if not lines:
-        return []
-    merged = []
-    prev = lines[0]
-    for curr in lines[1:]:
-        if abs(prev['bbox'][1] - curr['bbox'][1]) <= y_threshold and abs(prev['size'] - curr['size']) <= 0.5:
-            prev['text'] += ' ' + curr['text']
-            prev['bbox'] = (
-                prev['bbox'][0], min(prev['bbox'][1], curr['bbox'][1]),
-                prev['bbox'][2], max(prev['bbox'][3], curr['bbox'][3])
-            )
-        else:
-            merged.append(prev)
-            prev = curr
-    merged.append(prev)
-    return merged
-
-
-def get_document_lines(doc):
+def get_document_lines(doc, max_pages=None):
     all_lines = []
     text_count = defaultdict(int)
     for page_num, page in enumerate(doc):
-        page_height = page.rect.height
-        blocks = page.get_text("dict").get("blocks", [])
-        for block in blocks:
-            if block.get("type") != 0:
-                continue
-            raw_lines = []
+        if max_pages is not None and page_num >= max_pages:
+            break
+        textpage = page.get_textpage(flags=_TEXT_FLAGS)
+        blocks = textpage.extractDICT().get("blocks", [])
+        textpage = None
+        for block in (b for b in blocks if b.get("type") == 0):
+            prev = None
             for line in block.get("lines", []):
                 spans = line.get("spans", [])
                 if not spans:
@@ -52,77 +56,88 @@ def get_document_lines(doc):
                 fonts = [s.get("font", "").lower() for s in spans if s.get("text", "").strip()]
                 if not sizes:
                     continue
-                avg_size = mean(sizes)
-                is_bold = any("bold" in font for font in fonts)
-                raw_lines.append({
+                avg_size = sum(sizes) / len(sizes)
+                bbox = line.get("bbox", (0, 0, 0, 0))
+                if (prev is not None and abs(prev["bbox"][1] - bbox[1]) <= _MERGE_Y_THRESHOLD
+                        and abs(prev["size"] - avg_size) <= 0.5):
+                    prev["text"] += " " + line_text
+                    px0, py0, px1, py1 = prev["bbox"]
+                    prev["bbox"] = (px0, py0 if py0 < bbox[1] else bbox[1], px1, py1 if py1 > bbox[3] else bbox[3])
+                    continue
+                if prev is not None:
+                    prev["_lower"] = prev["text"].lower()
+                    text_count[prev["_lower"]] += 1
+                    all_lines.append(prev)
+                prev = {
                     "text": line_text,
                     "size": avg_size,
-                    "bold": is_bold,
+                    "bold": any("bold" in font for font in fonts),
                     "page": page_num,
-                    "bbox": line.get("bbox", (0, 0, 0, 0)),
-                    "page_height": page_height
-                })
-                text_count[line_text.lower()] += 1
-            merged = merge_close_lines(raw_lines)
-            all_lines.extend(merged)
-    return all_lines
+                    "bbox": bbox
+                }
+            if prev is not None:
+                prev["_lower"] = prev["text"].lower()
+                text_count[prev["_lower"]] += 1
+                all_lines.append(prev)
+    return all_lines, text_count
 
 
 def extract_title_from_layout(lines):
-    first_page_lines = sorted([l for l in lines if l["page"] == 0], key=lambda x: x["bbox"][1])
+    first_page_lines = []
+    bottom = None
+    for l in lines:
+        if l["page"] != 0:
+            continue
+        first_page_lines.append(l)
+        if bottom is None or l["bbox"][1] >= bottom["bbox"][1]:
+            bottom = l
     if not first_page_lines:
         return ""
-    page_height = first_page_lines[-1]["bbox"][3]
+    page_height = bottom["bbox"][3]
     top_section = [l for l in first_page_lines if l["bbox"][1] < page_height * 0.25]
     if not top_section:
-        top_section = first_page_lines[:min(5, len(first_page_lines))]
+        top_section = heapq.nsmallest(5, first_page_lines, key=lambda x: x["bbox"][1])
     max_size = max(l["size"] for l in top_section)
     candidates = [l for l in top_section if l["size"] >= max_size * 0.9]
-    candidates.sort(key=lambda x: (not x["bold"], abs(x["bbox"][0] + x["bbox"][2] - 595) / 2))
-    return candidates[0]["text"] if candidates else ""
+    if not candidates:
+        return ""
+    return min(candidates, key=lambda x: (not x["bold"], abs(x["bbox"][0] + x["bbox"][2] - 595) / 2, x["bbox"][1]))["text"]
+
+
+def _size_mode(sizes):
+    return int(np.bincount(np.rint(sizes).astype(np.intp)).argmax())
 
 
 def get_base_font_style(lines):
-    paragraph_sizes = [round(l["size"]) for l in lines if len(l["text"]) > 150]
-    if paragraph_sizes:
-        base_size = Counter(paragraph_sizes).most_common(1)[0][0]
+    paragraph_sizes = np.fromiter((l["size"] for l in lines if len(l["text"]) > 150), dtype=np.float64)
+    if paragraph_sizes.size:
+        base_size = _size_mode(paragraph_sizes)
     else:
-        all_sizes = [round(l["size"]) for l in lines]
-        base_size = Counter(all_sizes).most_common(1)[0][0] if all_sizes else 12
+        all_sizes = np.fromiter((l["size"] for l in lines), dtype=np.float64)
+        base_size = _size_mode(all_sizes) if all_sizes.size else 12
     return base_size
 
 
 def is_probably_noise(line, text_counts):
     text = line["text"].strip()
-    lowered = text.lower()
+    lowered = line.get("_lower") or text.lower()
     if len(text) < 5 or text_counts[lowered] > 2:
         return True
-    if re.match(r".*@.*\\..*", text):
-        return True
-    if re.search(r"\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b", text):
-        return True
-    if re.search(r"\b\d{5}(?:[-\s]\d{4})?\b", text):
-        return True
-    if re.search(r"\b(?:Street|St\.|Road|Rd\.|Parkway|Suite|Avenue)\b", text, re.IGNORECASE):
+    words = text.split()
+    if len(words) <= 4 and all(w.isupper() and not any(c.isdigit() for c in w) for w in words):
         return True
-    if re.search(r"(?:\b\w(?:\s|[:;.])+){4,}", text):
-        return True
-    if re.search(r"(RFP:\s*R\s+){2,}", text, re.IGNORECASE):
-        return True
-    if len(text.split()) <= 4 and all(w.isupper() and not any(c.isdigit() for c in w) for w in text.split()):
+    if text.count(" ") == 0 and text.isupper() and len(text) <= 20:
         return True
-    if any(nk in lowered for nk in ["overview", "email", "date", "rsvp", "address", "version", "waiver", "phone", "fax"]):
+    if _RE_NOISE_KW.search(lowered):
         return True
-    if any(kw in lowered for kw in ["s.no", "name", "age", "relationship", "dob", "gender"]):
-        return True
-    if text.count(" ") == 0 and text.isupper() and len(text) <= 20:
+    if _RE_NOISE.search(text):
         return True
     return False
 
 
 def is_likely_heading(line, base_size, text_counts):
     text = line["text"].strip()
-    if not re.search(r'[a-zA-Z]', text):
+    if not _RE_HAS_ALPHA.search(text):
         return False
     if len(text.split()) < 2 or len(text) > 150:
         return False
@@ -166,38 +181,39 @@ def cleanup_outline(outline):
     return cleaned
 
 
-def extract_outline_from_layout(lines):
+def extract_outline_from_layout(lines, text_counts):
     if not lines:
         return []
-    text_counts = Counter(line["text"].lower() for line in lines)
     base_size = get_base_font_style(lines)
-    candidates = [line for line in lines if is_likely_heading(line, base_size, text_counts)]
+    # Vectorised size/bold/length gates; only the survivors get the regex checks.
+    sizes = np.fromiter((l["size"] for l in lines), dtype=np.float64, count=len(lines))
+    bold = np.fromiter((l["bold"] for l in lines), dtype=np.bool_, count=len(lines))
+    text_lens = np.fromiter((len(l["text"]) for l in lines), dtype=np.int32, count=len(lines))
+    mask = ((sizes > base_size * 1.2) | bold) & (text_lens >= 5) & (text_lens <= 150)
+    candidates = [lines[i] for i in np.flatnonzero(mask) if is_likely_heading(lines[i], base_size, text_counts)]
     if not candidates:
         return []
-    x_positions = [l["bbox"][0] for l in lines if len(l["text"]) > 100]
-    base_x = mean(x_positions) if x_positions else 20
-    x_stdev = stdev(x_positions) if len(x_positions) > 1 else 10
-    styles = {}
+    x_positions = np.fromiter((l["bbox"][0] for l in lines if len(l["text"]) > 100), dtype=np.float64)
+    base_x = float(x_positions.mean()) if x_positions.size else 20
+    x_stdev = float(x_positions.std(ddof=1)) if x_positions.size > 1 else 10
+    indent1_x = base_x + x_stdev
+    indent2_x = base_x + (x_stdev * 3)
+    styles = set()
     for c in candidates:
         indent_level = 0
-        if c["bbox"][0] > base_x + x_stdev:
+        if c["bbox"][0] > indent1_x:
             indent_level = 1
-        if c["bbox"][0] > base_x + (x_stdev * 3):
+        if c["bbox"][0] > indent2_x:
             indent_level = 2
         style_key = (round(c["size"] * 2) / 2, c["bold"], indent_level)
-        styles.setdefault(style_key, []).append(c["text"])
-    ranked_styles = sorted(styles.keys(), key=lambda x: (-x[0], not x[1], x[2]))
+        c["_style_key"] = style_key
+        styles.add(style_key)
+    ranked_styles = sorted(styles, key=lambda x: (-x[0], not x[1], x[2]))
     level_map = {style: f"H{min(i + 1, 3)}" for i, style in enumerate(ranked_styles)}
     outline = []
     seen = set()
     for c in candidates:
-        indent_level = 0
-        if c["bbox"][0] > base_x + x_stdev:
-            indent_level = 1
-        if c["bbox"][0] > base_x + (x_stdev * 3):
-            indent_level = 2
-        style_key = (round(c["size"] * 2) / 2, c["bold"], indent_level)
-        level = level_map.get(style_key)
+        level = level_map.get(c["_style_key"])
         key = (c["text"], c["page"])
         if level and key not in seen:
             outline.append({"level": level, "text": c["text"], "page": c["page"]})
@@ -209,11 +225,8 @@ def process_pdf(pdf_path):
     try:
         doc = fitz.open(pdf_path)
         meta_title = clean_text(doc.metadata.get("title", ""))
-        lines = get_document_lines(doc)
-        fallback_title = extract_title_from_layout(lines)
-        title = fallback_title
-        if meta_title and not re.search(r"[_\\/\\-]|\.docx?$", meta_title):
-            title = meta_title
+        if meta_title and _RE_META_BAD.search(meta_title):
+            meta_title = ""
 
         toc = doc.get_toc(simple=False)
         outline = []
@@ -222,8 +235,18 @@ def process_pdf(pdf_path):
                 txt = clean_text(txt)
                 if lvl <= 3 and len(txt.split()) > 1 and len(txt) < 150:
                     outline.append({"level": f"H{lvl}", "text": txt, "page": page - 1})
-        if not outline or len(outline) < 3:
-            outline = extract_outline_from_layout(lines)
+
+        if len(outline) >= 3:
+            # The embedded TOC is good enough; the layout pass is only needed
+            # for the title, which is taken from the first page.
+            title = meta_title
+            if not title:
+                lines, _ = get_document_lines(doc, max_pages=1)
+                title = extract_title_from_layout(lines)
+        else:
+            lines, text_counts = get_document_lines(doc)
+            title = meta_title or extract_title_from_layout(lines)
+            outline = extract_outline_from_layout(lines, text_counts)
         doc.close()
         return {"title": title, "outline": outline}
     except Exception as e: